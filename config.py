@@ -1,12 +1,17 @@
 """Configuration management using environment variables."""
 import os
+from dataclasses import dataclass
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file once per process tree; worker
+# processes inherit the environment, so they skip re-parsing .env
+if not os.environ.get("_CONFIG_LOADED"):
+    load_dotenv()
+    os.environ["_CONFIG_LOADED"] = "1"
 
 
+@dataclass(frozen=True, slots=True)
 class Config:
     """Application configuration loaded from environment variables."""
     
@@ -28,17 +33,31 @@ class Config:
     PDF_STORAGE_PATH: Path = Path(os.getenv("PDF_STORAGE_PATH", "./extracted_pdfs"))
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     MAX_WORKERS: int = int(os.getenv("MAX_WORKERS", "4"))
+    # Number of PDFs handed to a worker process per task when processing
+    # a complete list (PDFProcessor.process_pdfs); streamed files go singly
+    PDF_CHUNK_SIZE: int = int(os.getenv("PDF_CHUNK_SIZE", "16"))
+    # Write the full extracted text next to each PDF for auditing. When
+    # disabled only the first MAX_PAGES_FOR_METADATA pages are parsed, and
+    # text_length is stored as NULL for documents that are longer
+    SAVE_EXTRACTED_TEXT: bool = os.getenv("SAVE_EXTRACTED_TEXT", "1") == "1"
+    # Pages parsed when only metadata (not the full text) is needed
+    MAX_PAGES_FOR_METADATA: int = int(os.getenv("MAX_PAGES_FOR_METADATA", "5"))
+    # OpenAI metadata results cached across runs, keyed by text hash
+    METADATA_CACHE_PATH: Path = Path(
+        os.getenv("METADATA_CACHE_PATH", str(Path.home() / ".cache" / "intellpro" / "metadata.sqlite"))
+    )
     
-    @classmethod
-    def validate(cls) -> None:
+    def validate(self) -> None:
         """Validate that required configuration is present."""
-        if not cls.SLACK_BOT_TOKEN:
+        if not self.SLACK_BOT_TOKEN:
             raise ValueError("SLACK_BOT_TOKEN is required")
-        if not cls.OPENAI_API_KEY:
+        if not self.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY is required")
     
-    @classmethod
-    def get_db_connection_string(cls) -> str:
+    def get_db_connection_string(self) -> str:
         """Get PostgreSQL connection string."""
-        return f"postgresql://{cls.POSTGRES_USER}:{cls.POSTGRES_PASSWORD}@{cls.POSTGRES_HOST}:{cls.POSTGRES_PORT}/{cls.POSTGRES_DB}"
+        return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+
+# Module-level singleton shared by all components
+CONFIG = Config()
@@ -1,14 +1,87 @@
 """PostgreSQL database manager for storing document metadata."""
+import csv
+import io
 import logging
-from typing import List, Dict, Any, Optional
-import psycopg2
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import date
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Iterator, Set, Tuple
+from psycopg2.pool import ThreadedConnectionPool
 from psycopg2.extras import RealDictCursor
 from psycopg2 import sql
 
-from config import Config
+from config import CONFIG
+
+if TYPE_CHECKING:
+    import asyncpg
 
 logger = logging.getLogger(__name__)
 
+_UPSERT_STATEMENT = "upsert_documents"
+
+# Takes one array per column and unnests them into rows, so a whole page
+# of documents is upserted by a single EXECUTE
+_PREPARE_UPSERT_SQL = f"""
+PREPARE {_UPSERT_STATEMENT} (text[], text[], text[], date[], text[], integer[], text[], text[], text[], integer[]) AS
+INSERT INTO documents (
+    file_id, file_name, title, publication_date,
+    extracted_text_path, text_length, slack_url,
+    message_ts, message_text, file_size
+)
+SELECT * FROM unnest($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+ON CONFLICT (file_id) 
+DO UPDATE SET
+    title = EXCLUDED.title,
+    publication_date = EXCLUDED.publication_date,
+    extracted_text_path = EXCLUDED.extracted_text_path,
+    text_length = EXCLUDED.text_length,
+    updated_at = CURRENT_TIMESTAMP
+RETURNING id;
+"""
+
+# Explicit casts: psycopg2 sends lists as ARRAY[...] literals, which would
+# otherwise be typed text[] (or fail to resolve when all elements are NULL)
+_EXECUTE_UPSERT_SQL = f"""
+EXECUTE {_UPSERT_STATEMENT} (
+    %s::text[], %s::text[], %s::text[], %s::date[], %s::text[],
+    %s::integer[], %s::text[], %s::text[], %s::text[], %s::integer[]
+);
+"""
+
+
+def _publication_date(document: Dict[str, Any]) -> Optional[date]:
+    """Parse a document's publication date, or None if it isn't a full ISO date.
+    
+    OpenAI sometimes answers with partial dates such as "2023" or
+    "March 2021". Left in place, one of those would make the server reject
+    the whole batch it is sent in, so it is stored as NULL instead.
+    """
+    value = document.get('publication_date')
+    if value is None or isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring invalid publication date {value!r} for {document['file_id']}")
+        return None
+
+
+def _document_row(document: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Build an insert row in ``documents`` column order from a document dict."""
+    return (
+        document['file_id'],
+        document['file_name'],
+        document.get('title'),
+        _publication_date(document),
+        str(document.get('text_file_path') or ''),
+        document.get('text_length', 0),
+        document.get('slack_url', ''),
+        document.get('message_ts', ''),
+        document.get('message_text', ''),
+        document.get('file_size', 0)
+    )
+
 
 class DatabaseManager:
     """Manage PostgreSQL database operations for document metadata."""
@@ -30,10 +103,50 @@ class DatabaseManager:
             'user': user,
             'password': password
         }
+        # Created lazily so the manager can be built before the database is up
+        self._pool: Optional[ThreadedConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        # Pooled connections the upsert statement has been prepared on
+        self._prepared = weakref.WeakSet()
+    
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """Return the connection pool, creating it on first use."""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadedConnectionPool(
+                        minconn=2,
+                        maxconn=CONFIG.MAX_WORKERS + 2,
+                        **self.connection_params
+                    )
+        return self._pool
+    
+    @contextmanager
+    def _conn(self) -> Iterator[Any]:
+        """Borrow a pooled connection for the duration of one transaction.
+        
+        The transaction is committed on success and rolled back on error;
+        the connection is then returned to the pool (or discarded if broken).
+        """
+        pool = self._get_pool()
+        conn = pool.getconn()
+        try:
+            with conn:
+                yield conn
+        finally:
+            pool.putconn(conn, close=bool(conn.closed))
     
-    def get_connection(self):
-        """Get a database connection."""
-        return psycopg2.connect(**self.connection_params)
+    def ping(self) -> None:
+        """Run a trivial query, raising if the database is unreachable."""
+        with self._conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+    
+    def close(self) -> None:
+        """Close all pooled connections."""
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
     
     def init_schema(self) -> None:
         """Initialize database schema.
@@ -61,13 +174,15 @@ class DatabaseManager:
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
         
-        -- Index for faster lookups
-        CREATE INDEX IF NOT EXISTS idx_file_id ON documents(file_id);
+        -- Index for faster lookups. file_id is already covered by the
+        -- index backing its UNIQUE constraint; drop the redundant one that
+        -- earlier versions created so upserts maintain one index less.
+        DROP INDEX IF EXISTS idx_file_id;
         CREATE INDEX IF NOT EXISTS idx_processed_at ON documents(processed_at);
         """
         
         try:
-            with self.get_connection() as conn:
+            with self._conn() as conn:
                 with conn.cursor() as cur:
                     cur.execute(schema_sql)
                     conn.commit()
@@ -76,23 +191,30 @@ class DatabaseManager:
             logger.error(f"Error initializing schema: {e}")
             raise
     
-    def document_exists(self, file_id: str) -> bool:
-        """Check if a document already exists in the database.
+    def existing_ids(self, file_ids: List[str]) -> Set[str]:
+        """Return which of the given file IDs are already stored.
+        
+        Uses a single ``= ANY(...)`` query rather than one existence check
+        per file. Writers don't need this: the upsert already resolves
+        conflicts in the same statement.
         
         Args:
-            file_id: Slack file ID
+            file_ids: Slack file IDs to look up
             
         Returns:
-            True if document exists, False otherwise
+            Set of file IDs present in the database (empty on error)
         """
+        if not file_ids:
+            return set()
+        
         try:
-            with self.get_connection() as conn:
+            with self._conn() as conn:
                 with conn.cursor() as cur:
-                    cur.execute("SELECT 1 FROM documents WHERE file_id = %s", (file_id,))
-                    return cur.fetchone() is not None
+                    cur.execute("SELECT file_id FROM documents WHERE file_id = ANY(%s)", (list(file_ids),))
+                    return {row[0] for row in cur.fetchall()}
         except Exception as e:
             logger.error(f"Error checking document existence: {e}")
-            return False
+            return set()
     
     def insert_document(self, document: Dict[str, Any]) -> Optional[int]:
         """Insert a document into the database.
@@ -127,15 +249,15 @@ class DatabaseManager:
         """
         
         try:
-            with self.get_connection() as conn:
+            with self._conn() as conn:
                 with conn.cursor() as cur:
                     # Prepare document data
                     doc_data = {
                         'file_id': document['file_id'],
                         'file_name': document['file_name'],
                         'title': document.get('title'),
-                        'publication_date': document.get('publication_date'),
-                        'extracted_text_path': str(document.get('text_file_path', '')),
+                        'publication_date': _publication_date(document),
+                        'extracted_text_path': str(document.get('text_file_path') or ''),
                         'text_length': document.get('text_length', 0),
                         'slack_url': document.get('slack_url', ''),
                         'message_ts': document.get('message_ts', ''),
@@ -155,25 +277,103 @@ class DatabaseManager:
             logger.error(f"Error inserting document: {e}")
             return None
     
+    def _ensure_upsert_prepared(self, conn, cur) -> None:
+        """Prepare the upsert statement on this connection if it isn't yet."""
+        if conn in self._prepared:
+            return
+        # The set only records committed preparations, so a connection we
+        # haven't seen may still carry the statement from a failed batch
+        cur.execute("SELECT 1 FROM pg_prepared_statements WHERE name = %s", (_UPSERT_STATEMENT,))
+        if cur.fetchone() is None:
+            cur.execute(_PREPARE_UPSERT_SQL)
+    
     def bulk_insert_documents(self, documents: List[Dict[str, Any]]) -> int:
         """Insert multiple documents into the database.
         
+        Each page of up to 1000 rows is sent as a single EXECUTE of a
+        server-side prepared INSERT ... ON CONFLICT statement, all inside
+        one transaction. The statement is parsed and planned once per
+        pooled connection instead of once per batch.
+        
         Args:
             documents: List of document dictionaries
             
         Returns:
             Number of documents successfully inserted/updated
         """
-        success_count = 0
+        if not documents:
+            return 0
         
-        for document in documents:
-            doc_id = self.insert_document(document)
-            if doc_id:
-                success_count += 1
+        # A single INSERT ... ON CONFLICT DO UPDATE cannot touch the same row
+        # twice, so collapse re-shared files to their last occurrence
+        unique_documents = {document['file_id']: document for document in documents}
+        
+        rows = [_document_row(document) for document in unique_documents.values()]
+        
+        try:
+            with self._conn() as conn:
+                with conn.cursor() as cur:
+                    self._ensure_upsert_prepared(conn, cur)
+                    success_count = 0
+                    for start in range(0, len(rows), 1000):
+                        # Transpose the page into one array per column
+                        columns = [list(column) for column in zip(*rows[start:start + 1000])]
+                        cur.execute(_EXECUTE_UPSERT_SQL, columns)
+                        success_count += len(cur.fetchall())
+            self._prepared.add(conn)
+        except Exception as e:
+            logger.error(f"Error bulk inserting documents: {e}")
+            success_count = 0
         
         logger.info(f"Successfully inserted/updated {success_count}/{len(documents)} documents")
         return success_count
     
+    def copy_insert_documents(self, documents: List[Dict[str, Any]]) -> int:
+        """Insert new documents with COPY FROM STDIN.
+        
+        COPY skips per-row SQL parsing and planning, making it the fastest
+        way to load documents that are not in the table yet. It has no
+        conflict handling: if any file_id already exists the whole batch is
+        rolled back, so callers should fall back to bulk_insert_documents.
+        
+        Args:
+            documents: List of document dictionaries with unique, new file IDs
+            
+        Returns:
+            Number of documents inserted (0 on failure)
+        """
+        if not documents:
+            return 0
+        
+        # None and '' both render as an empty CSV field, so mark NULLs
+        # explicitly to keep empty strings identical to the upsert path
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        for document in documents:
+            writer.writerow(['\\N' if value is None else value for value in _document_row(document)])
+        buffer.seek(0)
+        
+        copy_sql = """
+        COPY documents (
+            file_id, file_name, title, publication_date,
+            extracted_text_path, text_length, slack_url,
+            message_ts, message_text, file_size
+        ) FROM STDIN WITH (FORMAT csv, NULL '\\N')
+        """
+        
+        try:
+            with self._conn() as conn:
+                with conn.cursor() as cur:
+                    cur.copy_expert(copy_sql, buffer)
+            # COPY is all-or-nothing, so a committed copy stored every row
+            success_count = len(documents)
+        except Exception as e:
+            logger.error(f"Error copying documents: {e}")
+            return 0
+        
+        logger.info(f"Successfully copied {success_count}/{len(documents)} documents")
+        return success_count
+    
     def get_all_documents(self) -> List[Dict[str, Any]]:
         """Retrieve all documents from the database.
         
@@ -181,7 +381,7 @@ class DatabaseManager:
             List of document dictionaries
         """
         try:
-            with self.get_connection() as conn:
+            with self._conn() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cur:
                     cur.execute("SELECT * FROM documents ORDER BY processed_at DESC")
                     return [dict(row) for row in cur.fetchall()]
@@ -196,7 +396,7 @@ class DatabaseManager:
             Dictionary with processing statistics
         """
         try:
-            with self.get_connection() as conn:
+            with self._conn() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cur:
                     cur.execute("""
                         SELECT 
@@ -212,3 +412,152 @@ class DatabaseManager:
             logger.error(f"Error getting stats: {e}")
             return {}
 
+
+class AsyncDatabaseManager:
+    """Async alternative to DatabaseManager backed by an asyncpg pool.
+    
+    asyncpg speaks the binary protocol and pipelines ``executemany``, so
+    callers already running an event loop can write documents with less
+    per-query overhead than the psycopg2 manager. asyncpg is imported
+    only by ``connect()``, so the synchronous pipeline does not need it.
+    """
+    
+    def __init__(self, dsn: str, min_size: int = 2, max_size: Optional[int] = None):
+        """Initialize async database manager.
+        
+        Args:
+            dsn: PostgreSQL connection string
+            min_size: Minimum number of pooled connections
+            max_size: Maximum number of pooled connections.
+                      Defaults to CONFIG.MAX_WORKERS
+        """
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max(min_size, max_size or CONFIG.MAX_WORKERS)
+        self._pool: Optional["asyncpg.Pool"] = None
+    
+    async def connect(self) -> None:
+        """Create the connection pool.
+        
+        Raises:
+            RuntimeError: If asyncpg is not installed
+        """
+        if self._pool is None:
+            try:
+                import asyncpg
+            except ImportError as e:
+                raise RuntimeError("AsyncDatabaseManager requires asyncpg; install it with 'pip install asyncpg'") from e
+            self._pool = await asyncpg.create_pool(
+                self.dsn,
+                min_size=self.min_size,
+                max_size=self.max_size
+            )
+    
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+    
+    def _connected_pool(self) -> "asyncpg.Pool":
+        """Return the connection pool, failing clearly before connect()."""
+        if self._pool is None:
+            raise RuntimeError("AsyncDatabaseManager is not connected; await connect() first")
+        return self._pool
+    
+    async def existing_ids(self, file_ids: List[str]) -> Set[str]:
+        """Return which of the given file IDs are already stored.
+        
+        Args:
+            file_ids: Slack file IDs to look up
+            
+        Returns:
+            Set of file IDs present in the database (empty on error)
+            
+        Raises:
+            RuntimeError: If connect() has not been awaited
+        """
+        if not file_ids:
+            return set()
+        
+        pool = self._connected_pool()
+        try:
+            rows = await pool.fetch(
+                "SELECT file_id FROM documents WHERE file_id = ANY($1::text[])",
+                list(file_ids)
+            )
+            return {row['file_id'] for row in rows}
+        except Exception as e:
+            logger.error(f"Error checking document existence: {e}")
+            return set()
+    
+    async def bulk_insert_documents(self, documents: List[Dict[str, Any]]) -> int:
+        """Insert multiple documents into the database in one transaction.
+        
+        Args:
+            documents: List of document dictionaries
+            
+        Returns:
+            Number of documents successfully inserted/updated
+            
+        Raises:
+            RuntimeError: If connect() has not been awaited
+        """
+        if not documents:
+            return 0
+        
+        pool = self._connected_pool()
+        insert_sql = """
+        INSERT INTO documents (
+            file_id, file_name, title, publication_date,
+            extracted_text_path, text_length, slack_url,
+            message_ts, message_text, file_size
+        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+        ON CONFLICT (file_id) 
+        DO UPDATE SET
+            title = EXCLUDED.title,
+            publication_date = EXCLUDED.publication_date,
+            extracted_text_path = EXCLUDED.extracted_text_path,
+            text_length = EXCLUDED.text_length,
+            updated_at = CURRENT_TIMESTAMP
+        """
+        
+        unique_documents = {document['file_id']: document for document in documents}
+        rows = [_document_row(document) for document in unique_documents.values()]
+        
+        try:
+            async with pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.executemany(insert_sql, rows)
+            success_count = len(rows)
+        except Exception as e:
+            logger.error(f"Error bulk inserting documents: {e}")
+            success_count = 0
+        
+        logger.info(f"Successfully inserted/updated {success_count}/{len(documents)} documents")
+        return success_count
+    
+    async def get_processing_stats(self) -> Dict[str, Any]:
+        """Get statistics about processed documents.
+        
+        Returns:
+            Dictionary with processing statistics
+            
+        Raises:
+            RuntimeError: If connect() has not been awaited
+        """
+        pool = self._connected_pool()
+        try:
+            row = await pool.fetchrow("""
+                SELECT 
+                    COUNT(*) as total_documents,
+                    COUNT(title) as documents_with_title,
+                    COUNT(publication_date) as documents_with_date,
+                    SUM(text_length) as total_text_length,
+                    SUM(file_size) as total_file_size
+                FROM documents
+            """)
+            return dict(row)
+        except Exception as e:
+            logger.error(f"Error getting stats: {e}")
+            return {}
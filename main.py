@@ -1,51 +1,69 @@
 """Main application entry point for document ingestion pipeline."""
+import argparse
 import logging
+import socket
 import sys
 import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from config import Config
-from slack_client import SlackClient
-from pdf_processor import PDFProcessor
-from metadata_extractor import MetadataExtractor
-from db_manager import DatabaseManager
+from config import CONFIG
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('pipeline.log')
-    ]
-)
+if TYPE_CHECKING:
+    from db_manager import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
 
-def wait_for_database(db_manager: DatabaseManager, max_attempts: int = 30, delay: int = 2) -> bool:
+def configure_logging() -> None:
+    """Log to the console and to pipeline.log.
+    
+    Called from main() rather than at import time, so processes that
+    merely import this module (e.g. PDF worker processes) don't install
+    handlers of their own.
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(sys.stdout),
+            logging.FileHandler('pipeline.log')
+        ]
+    )
+
+
+def wait_for_database(db_manager: "DatabaseManager", max_attempts: int = 10, max_delay: int = 10) -> bool:
     """Wait for database to be ready.
     
+    Each attempt first probes the server port with a plain TCP connect,
+    which fails fast and cheaply while PostgreSQL is still starting; only
+    once the port accepts connections is a full database handshake tried.
+    Attempts back off exponentially (1s, 2s, 4s, ...) up to ``max_delay``.
+    
     Args:
         db_manager: Database manager instance
         max_attempts: Maximum number of connection attempts
-        delay: Delay between attempts in seconds
+        max_delay: Maximum delay between attempts in seconds
         
     Returns:
         True if database is ready, False otherwise
     """
     logger.info("Waiting for database to be ready...")
     
+    host = db_manager.connection_params['host']
+    port = db_manager.connection_params['port']
+    
     for attempt in range(max_attempts):
         try:
-            with db_manager.get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT 1")
+            with socket.create_connection((host, port), timeout=1.0):
+                pass
+            db_manager.ping()
             logger.info("Database is ready!")
             return True
         except Exception as e:
             if attempt < max_attempts - 1:
-                logger.info(f"Database not ready yet (attempt {attempt + 1}/{max_attempts}), waiting...")
+                delay = min(max_delay, 1 << attempt)
+                logger.info(f"Database not ready yet (attempt {attempt + 1}/{max_attempts}), retrying in {delay}s...")
                 time.sleep(delay)
             else:
                 logger.error(f"Failed to connect to database after {max_attempts} attempts: {e}")
@@ -54,31 +72,56 @@ def wait_for_database(db_manager: DatabaseManager, max_attempts: int = 30, delay
     return False
 
 
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Ingest PDF documents from Slack into PostgreSQL")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Reprocess files that are already stored in the database"
+    )
+    return parser.parse_args()
+
+
 def main():
     """Main pipeline execution."""
+    # Imported here rather than at module level: PDF worker processes
+    # re-import this module, and shouldn't load the API client libraries
+    from slack_client import SlackClient
+    from pdf_processor import PDFProcessor
+    from metadata_extractor import MetadataExtractor
+    from db_manager import DatabaseManager
+    from pipeline import IngestionPipeline
+    
+    args = parse_args()
+    configure_logging()
+    
     logger.info("=" * 80)
     logger.info("Starting Document Ingestion Pipeline")
     logger.info("=" * 80)
     
     start_time = time.time()
+    slack_client = None
+    metadata_extractor = None
+    db_manager = None
     
     try:
         # Validate configuration
-        Config.validate()
+        CONFIG.validate()
         logger.info("Configuration validated successfully")
         
         # Initialize components
         logger.info("Initializing components...")
         
-        slack_client = SlackClient(Config.SLACK_BOT_TOKEN)
-        pdf_processor = PDFProcessor(Config.MAX_WORKERS)
-        metadata_extractor = MetadataExtractor(Config.OPENAI_API_KEY)
+        slack_client = SlackClient(CONFIG.SLACK_BOT_TOKEN)
+        pdf_processor = PDFProcessor(CONFIG.MAX_WORKERS)
+        metadata_extractor = MetadataExtractor(CONFIG.OPENAI_API_KEY)
         db_manager = DatabaseManager(
-            host=Config.POSTGRES_HOST,
-            port=Config.POSTGRES_PORT,
-            database=Config.POSTGRES_DB,
-            user=Config.POSTGRES_USER,
-            password=Config.POSTGRES_PASSWORD
+            host=CONFIG.POSTGRES_HOST,
+            port=CONFIG.POSTGRES_PORT,
+            database=CONFIG.POSTGRES_DB,
+            user=CONFIG.POSTGRES_USER,
+            password=CONFIG.POSTGRES_PASSWORD
         )
         
         # Wait for database and initialize schema
@@ -88,55 +131,22 @@ def main():
         
         db_manager.init_schema()
         
-        # Step 1: Fetch messages from Slack
+        # Steps 1-5: Page through Slack history while downloading, extracting,
+        # enriching and storing the PDFs found so far
         logger.info("\n" + "=" * 80)
-        logger.info("STEP 1: Fetching messages from Slack")
+        logger.info("STEPS 1-5: Fetching messages, downloading, processing, extracting metadata and storing")
         logger.info("=" * 80)
         
-        messages = slack_client.fetch_messages(Config.SLACK_CHANNEL)
-        logger.info(f"Found {len(messages)} messages with PDF attachments")
+        # Skip files that earlier runs already stored (one query per history page)
+        known_ids = None if args.force else db_manager.existing_ids
         
-        if not messages:
-            logger.info("No PDF files found in channel. Pipeline complete.")
-            return
-        
-        # Step 2: Download PDF files
-        logger.info("\n" + "=" * 80)
-        logger.info("STEP 2: Downloading PDF files")
-        logger.info("=" * 80)
+        pipeline = IngestionPipeline(slack_client, pdf_processor, metadata_extractor, db_manager)
+        counts = pipeline.run_channel(CONFIG.SLACK_CHANNEL, CONFIG.PDF_STORAGE_PATH, known_ids=known_ids)
         
-        Config.PDF_STORAGE_PATH.mkdir(parents=True, exist_ok=True)
-        downloaded_files = slack_client.download_all_pdfs(messages, Config.PDF_STORAGE_PATH)
-        logger.info(f"Downloaded {len(downloaded_files)} PDF files")
-        
-        if not downloaded_files:
-            logger.info("No files to process. Pipeline complete.")
+        if not counts['downloaded']:
+            logger.info("No new PDF files found in channel. Pipeline complete.")
             return
         
-        # Step 3: Process PDFs in parallel
-        logger.info("\n" + "=" * 80)
-        logger.info("STEP 3: Processing PDFs in parallel")
-        logger.info("=" * 80)
-        
-        processed_files = pdf_processor.process_pdfs(downloaded_files)
-        logger.info(f"Processed {len(processed_files)} PDFs")
-        
-        # Step 4: Extract metadata using OpenAI
-        logger.info("\n" + "=" * 80)
-        logger.info("STEP 4: Extracting metadata with OpenAI")
-        logger.info("=" * 80)
-        
-        files_with_metadata = metadata_extractor.process_files(processed_files)
-        logger.info(f"Extracted metadata for {len(files_with_metadata)} files")
-        
-        # Step 5: Store results in database
-        logger.info("\n" + "=" * 80)
-        logger.info("STEP 5: Storing results in database")
-        logger.info("=" * 80)
-        
-        inserted_count = db_manager.bulk_insert_documents(files_with_metadata)
-        logger.info(f"Stored {inserted_count} documents in database")
-        
         # Display statistics
         logger.info("\n" + "=" * 80)
         logger.info("PIPELINE STATISTICS")
@@ -158,6 +168,13 @@ def main():
     except Exception as e:
         logger.error(f"Pipeline failed with error: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        if slack_client is not None:
+            slack_client.close()
+        if metadata_extractor is not None:
+            metadata_extractor.close()
+        if db_manager is not None:
+            db_manager.close()
 
 
 if __name__ == "__main__":
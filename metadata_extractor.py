@@ -1,11 +1,16 @@
 """Metadata extraction using OpenAI API."""
+import asyncio
+import hashlib
 import logging
 import json
-import time
+import sqlite3
+from pathlib import Path
 from typing import Dict, Optional, Any, List
-from openai import OpenAI, RateLimitError, APIError
+import httpx
+import orjson
+from openai import AsyncOpenAI, RateLimitError, APIError
 
-from config import Config
+from config import CONFIG
 
 logger = logging.getLogger(__name__)
 
@@ -13,16 +18,79 @@ logger = logging.getLogger(__name__)
 class MetadataExtractor:
     """Extract document metadata using OpenAI API."""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_path: Optional[Path] = None):
         """Initialize metadata extractor.
         
         Args:
             api_key: OpenAI API key
+            cache_path: SQLite file caching extracted metadata across runs.
+                        Defaults to CONFIG.METADATA_CACHE_PATH
         """
-        self.client = OpenAI(api_key=api_key)
+        self.api_key = api_key
+        # Opened lazily on the event loop that uses it; see _get_client
+        self.client: Optional[AsyncOpenAI] = None
         self.model = "gpt-4o-mini"  # Cost-effective model for metadata extraction
+        
+        cache_path = cache_path or CONFIG.METADATA_CACHE_PATH
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Only ever used from the single event loop thread at a time
+        self._cache = sqlite3.connect(cache_path, check_same_thread=False)
+        self._cache.execute(
+            "CREATE TABLE IF NOT EXISTS metadata "
+            "(hash TEXT PRIMARY KEY, title TEXT, publication_date TEXT)"
+        )
+        self._cache.commit()
+    
+    def _get_client(self) -> AsyncOpenAI:
+        """Return the shared client, opening it on the running event loop."""
+        if self.client is None:
+            # One shared HTTP/2 connection pool: concurrent requests multiplex
+            # over a single TLS connection instead of each paying a handshake
+            self.client = AsyncOpenAI(
+                api_key=self.api_key,
+                http_client=httpx.AsyncClient(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=32, max_keepalive_connections=32)
+                )
+            )
+        return self.client
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP client.
+        
+        Must be awaited on the event loop that used the client: its
+        connections are bound to that loop and cannot be closed once
+        the loop has finished. The next request opens a fresh client.
+        """
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+    
+    def close(self) -> None:
+        """Close the metadata cache and drop any leftover HTTP client."""
+        # Callers close the client on their own loop via aclose(); one
+        # still set here belonged to a loop that has already finished
+        self.client = None
+        self._cache.close()
+    
+    def _cache_get(self, key: str) -> Optional[Dict[str, Optional[str]]]:
+        """Look up cached metadata by text hash."""
+        row = self._cache.execute(
+            "SELECT title, publication_date FROM metadata WHERE hash = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'title': row[0], 'publication_date': row[1]}
     
-    def extract_metadata(self, text: str, max_retries: int = 3) -> Dict[str, Optional[str]]:
+    def _cache_put(self, key: str, metadata: Dict[str, Optional[str]]) -> None:
+        """Store extracted metadata under its text hash."""
+        self._cache.execute(
+            "INSERT OR REPLACE INTO metadata (hash, title, publication_date) VALUES (?, ?, ?)",
+            (key, metadata['title'], metadata['publication_date'])
+        )
+        self._cache.commit()
+    
+    async def extract_metadata(self, text: str, max_retries: int = 3) -> Dict[str, Optional[str]]:
         """Extract document title and publication date from text using OpenAI.
         
         Args:
@@ -33,9 +101,17 @@ class MetadataExtractor:
             Dictionary with 'title' and 'publication_date' keys
         """
         # Truncate text to first 3000 characters for cost efficiency
-        # Most document metadata is in the first few pages
+        # Most document metadata is in the first few pages. PDFProcessor
+        # already caps extracted_text, but callers may pass full text.
         truncated_text = text[:3000] if len(text) > 3000 else text
         
+        # Unchanged documents hit the cache and skip the API call entirely
+        cache_key = hashlib.sha256(truncated_text.encode()).hexdigest()
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"Using cached metadata: {cached}")
+            return cached
+        
         # Design an effective prompt for metadata extraction
         system_prompt = """You are a document metadata extraction assistant. 
 Your task is to extract the document title and publication/creation date from the provided text.
@@ -57,7 +133,7 @@ Return JSON with "title" and "publication_date" fields."""
             try:
                 logger.info(f"Calling OpenAI API for metadata extraction (attempt {attempt + 1}/{max_retries})...")
                 
-                response = self.client.chat.completions.create(
+                response = await self._get_client().chat.completions.create(
                     model=self.model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -68,21 +144,23 @@ Return JSON with "title" and "publication_date" fields."""
                     max_tokens=200
                 )
                 
-                result = json.loads(response.choices[0].message.content)
+                result = orjson.loads(response.choices[0].message.content)
                 
                 logger.info(f"Extracted metadata: {result}")
                 
-                return {
+                metadata = {
                     'title': result.get('title'),
                     'publication_date': result.get('publication_date')
                 }
+                self._cache_put(cache_key, metadata)
+                return metadata
                 
             except RateLimitError as e:
                 logger.warning(f"Rate limit hit: {e}")
                 if attempt < max_retries - 1:
                     wait_time = 2 ** attempt  # Exponential backoff
                     logger.info(f"Waiting {wait_time} seconds before retry...")
-                    time.sleep(wait_time)
+                    await asyncio.sleep(wait_time)
                 else:
                     logger.error("Max retries reached for rate limit")
                     return {'title': None, 'publication_date': None}
@@ -90,11 +168,11 @@ Return JSON with "title" and "publication_date" fields."""
             except APIError as e:
                 logger.error(f"OpenAI API error: {e}")
                 if attempt < max_retries - 1:
-                    time.sleep(2)
+                    await asyncio.sleep(2)
                 else:
                     return {'title': None, 'publication_date': None}
                     
-            except json.JSONDecodeError as e:
+            except (json.JSONDecodeError, orjson.JSONDecodeError) as e:
                 logger.error(f"Failed to parse OpenAI response as JSON: {e}")
                 return {'title': None, 'publication_date': None}
                 
@@ -104,6 +182,54 @@ Return JSON with "title" and "publication_date" fields."""
         
         return {'title': None, 'publication_date': None}
     
+    async def process_file_async(self, file_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract metadata for a single file.
+        
+        Args:
+            file_info: File dictionary with extracted_text
+            
+        Returns:
+            File dictionary with added metadata fields
+        """
+        text = file_info.get('extracted_text', '')
+        if not text:
+            logger.warning(f"No text available for {file_info['file_name']}")
+            metadata = {'title': None, 'publication_date': None}
+        else:
+            metadata = await self.extract_metadata(text)
+        
+        return {
+            **file_info,
+            **metadata
+        }
+    
+    async def _one(self, sem: asyncio.Semaphore, file_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Process a single file while holding a concurrency slot."""
+        async with sem:
+            logger.info(f"Processing file: {file_info['file_name']}")
+            return await self.process_file_async(file_info)
+    
+    async def _process_files_async(self, files: List[Dict[str, Any]], concurrency: int = 8) -> List[Dict[str, Any]]:
+        """Extract metadata for many files with bounded concurrency.
+        
+        Each extraction is an HTTP round-trip to OpenAI, so overlapping
+        requests gives a near-linear speedup up to ``concurrency``.
+        Rate limits are handled by the retry/backoff in extract_metadata.
+        
+        Args:
+            files: List of file dictionaries with extracted_text
+            concurrency: Maximum number of in-flight OpenAI requests
+            
+        Returns:
+            List of files with added metadata fields, in input order
+        """
+        sem = asyncio.Semaphore(concurrency)
+        tasks = [self._one(sem, file_info) for file_info in files]
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            await self.aclose()
+    
     def process_files(self, files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Process multiple files and extract metadata from each.
         
@@ -115,26 +241,7 @@ Return JSON with "title" and "publication_date" fields."""
         """
         logger.info(f"Extracting metadata from {len(files)} files...")
         
-        processed_files = []
-        for i, file_info in enumerate(files, 1):
-            logger.info(f"Processing file {i}/{len(files)}: {file_info['file_name']}")
-            
-            text = file_info.get('extracted_text', '')
-            if not text:
-                logger.warning(f"No text available for {file_info['file_name']}")
-                metadata = {'title': None, 'publication_date': None}
-            else:
-                metadata = self.extract_metadata(text)
-            
-            processed_files.append({
-                **file_info,
-                **metadata
-            })
-            
-            # Small delay to avoid hitting rate limits
-            if i < len(files):
-                time.sleep(0.5)
+        processed_files = asyncio.run(self._process_files_async(files))
         
         logger.info("Metadata extraction complete")
         return processed_files
-
@@ -1,51 +1,153 @@
 """PDF text extraction using PyMuPDF with multiprocessing."""
 import logging
+import multiprocessing
+import multiprocessing.pool
+import sys
+import threading
+from contextlib import nullcontext
+from itertools import chain, islice
 from pathlib import Path
-from typing import Dict, List, Any
-from multiprocessing import Pool, cpu_count
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+from multiprocessing import cpu_count
 import fitz  # PyMuPDF
 
-from config import Config
+from config import CONFIG
 
 logger = logging.getLogger(__name__)
 
+# Plain reading-order text is all metadata extraction needs: skip block
+# sorting and whitespace/ligature preservation, but keep mediabox clipping
+_TEXT_FLAGS = fitz.TEXT_MEDIABOX_CLIP | fitz.TEXT_INHIBIT_SPACES
 
-def extract_text_from_pdf(pdf_path: Path) -> str:
+_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Workers are forked from a clean server process rather than from the
+# parent, which holds API clients, DB connections and pipeline threads
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _init_worker(log_level: int) -> None:
+    """Configure logging in a freshly started worker process.
+    
+    Workers no longer inherit the parent's handlers, so set up the same
+    console and file output as main.py. ``force`` replaces any handlers a
+    preloaded or re-imported main module may already have installed.
+    
+    Args:
+        log_level: Logging level of the parent process
+    """
+    logging.basicConfig(
+        force=True,
+        level=log_level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(sys.stdout),
+            logging.FileHandler('pipeline.log')
+        ]
+    )
+
+
+def _worker_pool(processes: int) -> multiprocessing.pool.Pool:
+    """Create a pool of extraction workers.
+    
+    The forkserver preloads ``__main__`` by default; preload this module
+    instead, so PyMuPDF is imported once by the server and inherited by
+    every worker. Workers still import the main script themselves, which
+    is why main.py keeps its module level free of heavy imports.
+    
+    Args:
+        processes: Number of worker processes
+    """
+    ctx = multiprocessing.get_context(_START_METHOD)
+    if _START_METHOD == "forkserver":
+        ctx.set_forkserver_preload([__name__])
+    return ctx.Pool(
+        processes=processes,
+        initializer=_init_worker,
+        initargs=(logging.getLogger().getEffectiveLevel(),)
+    )
+
+
+def extract_text_from_pdf(pdf_path: Path, text_file_path: Optional[Path] = None, max_chars: int = 4000) -> Tuple[str, Optional[int]]:
     """Extract text from a single PDF file using PyMuPDF.
     
+    Page text is streamed straight into the output text file instead of
+    being collected and joined in memory. Only the leading ``max_chars``
+    characters are kept, since that is all metadata extraction needs and
+    it keeps the result small when pickled back to the parent process.
+    
+    When no text file is requested only metadata is needed, so just the
+    first CONFIG.MAX_PAGES_FOR_METADATA pages are parsed. The length of a
+    document read only in part is unknown and reported as None.
+    
     This function is designed to be used with multiprocessing.
     
     Args:
         pdf_path: Path to the PDF file
+        text_file_path: Path of the text file to write the full text to,
+                        or None to extract only the leading text
+        max_chars: Maximum number of leading characters to return
         
     Returns:
-        Extracted text content
+        Tuple of (leading text, total number of characters in the
+        document, or None if it was not read to the end)
     """
+    head_parts = []
+    head_length = 0
+    text_length = 0
+    complete = True
+    
     try:
         logger.info(f"Extracting text from {pdf_path.name}...")
         
-        doc = fitz.open(pdf_path)
-        text_content = []
-        
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text_content.append(page.get_text())
-        
-        doc.close()
-        
-        full_text = "\n".join(text_content)
-        logger.info(f"Extracted {len(full_text)} characters from {pdf_path.name}")
+        with fitz.open(pdf_path) as doc:
+            if text_file_path is None and len(doc) > CONFIG.MAX_PAGES_FOR_METADATA:
+                doc.select(list(range(CONFIG.MAX_PAGES_FOR_METADATA)))
+                complete = False
+            
+            # A large buffer batches the per-page writes into few syscalls
+            if text_file_path:
+                text_file = open(text_file_path, 'w', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE)
+            else:
+                text_file = nullcontext()
+            
+            with text_file as f:
+                for page_num in range(len(doc)):
+                    page_text = doc[page_num].get_text("text", sort=False, flags=_TEXT_FLAGS)
+                    if page_num:
+                        page_text = "\n" + page_text
+                    if f is not None:
+                        f.write(page_text)
+                    text_length += len(page_text)
+                    
+                    if head_length < max_chars:
+                        head_parts.append(page_text)
+                        head_length += len(page_text)
+                    elif f is None:
+                        complete = complete and page_num == len(doc) - 1
+                        break
         
-        return full_text
+        if complete:
+            logger.info(f"Extracted {text_length} characters from {pdf_path.name}")
+        else:
+            logger.info(f"Extracted the first {text_length} characters from {pdf_path.name}")
+        if text_file_path:
+            logger.info(f"Saved extracted text to {text_file_path}")
         
     except Exception as e:
         logger.error(f"Error extracting text from {pdf_path}: {e}")
-        return ""
+        complete = False
+    
+    return "".join(head_parts)[:max_chars], text_length if complete else None
 
 
 def process_single_pdf(file_info: Dict[str, Any]) -> Dict[str, Any]:
     """Process a single PDF file (wrapper for multiprocessing).
     
+    When CONFIG.SAVE_EXTRACTED_TEXT is set the full text is saved to a
+    separate file for auditing; only the leading window needed for
+    metadata extraction is returned.
+    
     Args:
         file_info: Dictionary containing file metadata and local_path
         
@@ -53,25 +155,52 @@ def process_single_pdf(file_info: Dict[str, Any]) -> Dict[str, Any]:
         Dictionary with file info and extracted text
     """
     pdf_path = file_info['local_path']
-    extracted_text = extract_text_from_pdf(pdf_path)
-    
-    # Save extracted text to a separate file for auditing
-    text_file_path = pdf_path.with_suffix('.txt')
-    try:
-        with open(text_file_path, 'w', encoding='utf-8') as f:
-            f.write(extracted_text)
-        logger.info(f"Saved extracted text to {text_file_path}")
-    except Exception as e:
-        logger.error(f"Error saving text file: {e}")
+    text_file_path = pdf_path.with_suffix('.txt') if CONFIG.SAVE_EXTRACTED_TEXT else None
+    head_text, text_length = extract_text_from_pdf(pdf_path, text_file_path)
     
     return {
         **file_info,
-        'extracted_text': extracted_text,
+        'extracted_text': head_text,
         'text_file_path': text_file_path,
-        'text_length': len(extracted_text)
+        'text_length': text_length
     }
 
 
+def _process_batch(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Process a batch of PDF files sequentially within one worker task.
+    
+    Args:
+        batch: List of file info dictionaries with local_path
+        
+    Returns:
+        List of processed file dictionaries
+    """
+    return [process_single_pdf(file_info) for file_info in batch]
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Group an iterable, possibly a lazy one, into lists of ``size`` items."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _throttled(items: Iterable[Any], slots: threading.BoundedSemaphore,
+               stop: threading.Event) -> Iterator[Any]:
+    """Yield items only while a slot is free, until ``stop`` is set.
+    
+    Pool.imap_unordered drains its input from a background thread as fast
+    as it can, so this is what keeps a lazy input from running ahead.
+    """
+    for item in items:
+        # Poll so an abandoned consumer can't leave the pool's task
+        # handler blocked here (Pool.terminate joins that thread)
+        while not slots.acquire(timeout=0.1):
+            if stop.is_set():
+                return
+        yield item
+
+
 class PDFProcessor:
     """Process multiple PDFs in parallel using multiprocessing."""
     
@@ -80,14 +209,63 @@ class PDFProcessor:
         
         Args:
             max_workers: Maximum number of worker processes. 
-                        Defaults to CPU count or Config.MAX_WORKERS
+                        Defaults to CPU count or CONFIG.MAX_WORKERS
         """
         if max_workers is None:
-            max_workers = min(Config.MAX_WORKERS, cpu_count())
+            max_workers = min(CONFIG.MAX_WORKERS, cpu_count())
         
         self.max_workers = max_workers
         logger.info(f"Initialized PDFProcessor with {self.max_workers} workers")
     
+    def iter_process_pdfs(self, files: Iterable[Dict[str, Any]], chunk_size: int = 1,
+                          max_in_flight: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Process PDF files in parallel, yielding results as they complete.
+        
+        ``files`` may be a lazy iterable (e.g. one fed from a queue): the
+        pool dispatches work as items arrive, so extraction overlaps with
+        whatever is producing them. Results are yielded in completion order.
+        
+        By default each file is its own task. Larger batches let small PDFs
+        share one task and one pickled result, but a batch is only
+        dispatched once it is full, so they only suit inputs that are
+        already complete: on a queue they would hold files back until
+        ``chunk_size`` had arrived.
+        
+        The pool reads ``files`` and buffers finished results without limit.
+        ``max_in_flight`` caps the tasks taken from ``files`` but not yet
+        consumed by the caller. When the caller stops consuming, input
+        stops being read, so a bounded queue feeding ``files`` fills up
+        and blocks its producer.
+        
+        Args:
+            files: Iterable of file info dictionaries with local_path
+            chunk_size: Number of files handed to a worker per task
+            max_in_flight: Maximum number of tasks dispatched but not yet
+                           yielded, or None for no limit
+            
+        Yields:
+            Processed file dictionaries with extracted text
+        """
+        # Use multiprocessing Pool for parallel processing
+        # This is effective for CPU-bound PDF text extraction.
+        # imap_unordered pulls its input lazily, unlike executor.map,
+        # which submits the whole input before yielding anything.
+        with _worker_pool(self.max_workers) as pool:
+            if max_in_flight is None:
+                batches = pool.imap_unordered(_process_batch, _chunked(files, chunk_size))
+                yield from chain.from_iterable(batches)
+                return
+            
+            slots = threading.BoundedSemaphore(max_in_flight)
+            stop = threading.Event()
+            try:
+                tasks = _throttled(_chunked(files, chunk_size), slots, stop)
+                for batch in pool.imap_unordered(_process_batch, tasks):
+                    yield from batch
+                    slots.release()
+            finally:
+                stop.set()
+    
     def process_pdfs(self, files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Process multiple PDF files in parallel.
         
@@ -106,16 +284,20 @@ class PDFProcessor:
         
         logger.info(f"Processing {len(files)} PDFs with {self.max_workers} workers...")
         
-        # Use multiprocessing Pool for parallel processing
-        # This is effective for CPU-bound PDF text extraction
-        with Pool(processes=self.max_workers) as pool:
-            processed_files = pool.map(process_single_pdf, files)
+        # Keep at least ~4 tasks per worker for load balancing on
+        # batches too small to fill CONFIG.PDF_CHUNK_SIZE-sized tasks
+        chunk_size = max(1, min(CONFIG.PDF_CHUNK_SIZE, len(files) // (4 * self.max_workers)))
+        # Collect results as they complete and count characters on the
+        # way, instead of a separate pass over the full list afterwards
+        processed_files = []
+        total_chars = 0
+        for processed_file in self.iter_process_pdfs(files, chunk_size=chunk_size):
+            processed_files.append(processed_file)
+            total_chars += processed_file['text_length'] or 0
         
         logger.info(f"Completed processing {len(processed_files)} PDFs")
         
         # Log statistics
-        total_chars = sum(f['text_length'] for f in processed_files)
         logger.info(f"Total characters extracted: {total_chars}")
         
         return processed_files
-
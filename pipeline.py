@@ -0,0 +1,276 @@
+"""Streaming ingestion pipeline connecting the stages with bounded queues."""
+import asyncio
+import logging
+import queue
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Iterator, Optional, Set
+
+from config import CONFIG
+from slack_client import SlackClient, DownloadResult
+from pdf_processor import PDFProcessor
+from metadata_extractor import MetadataExtractor
+from db_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# End-of-stream marker passed down each queue
+_SENTINEL = object()
+
+
+class IngestionPipeline:
+    """Run download, extraction, metadata and storage stages concurrently.
+
+    Each stage runs in its own thread and hands items to the next one
+    through a bounded queue, so while OpenAI is answering for one file the
+    workers are already extracting the next ones and the database is
+    storing earlier results. Full queues block the producing stage, which
+    keeps memory bounded when a downstream stage is slower.
+    """
+
+    def __init__(
+        self,
+        slack_client: SlackClient,
+        pdf_processor: PDFProcessor,
+        metadata_extractor: MetadataExtractor,
+        db_manager: DatabaseManager,
+        queue_size: Optional[int] = None,
+        batch_size: int = 100,
+        metadata_concurrency: int = 8,
+        flush_interval: float = 5.0
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            slack_client: Client used to download PDF files
+            pdf_processor: Processor used to extract text in worker processes
+            metadata_extractor: Extractor used to call OpenAI
+            db_manager: Database manager used to store documents
+            queue_size: Capacity of each inter-stage queue.
+                        Defaults to 2 * CONFIG.MAX_WORKERS
+            batch_size: Maximum number of documents per database write
+            metadata_concurrency: Maximum number of in-flight OpenAI requests
+            flush_interval: Seconds to wait for a full batch before writing
+                            a partial one
+        """
+        self.slack_client = slack_client
+        self.pdf_processor = pdf_processor
+        self.metadata_extractor = metadata_extractor
+        self.db_manager = db_manager
+        self.queue_size = queue_size or 2 * CONFIG.MAX_WORKERS
+        self.batch_size = batch_size
+        self.metadata_concurrency = metadata_concurrency
+        self.flush_interval = flush_interval
+
+    def run(self, messages: List[Dict[str, Any]], download_path: Path) -> Dict[str, int]:
+        """Process all PDF files attached to the given messages.
+
+        Args:
+            messages: List of messages with PDF files
+            download_path: Directory to save downloaded files
+
+        Returns:
+            Dictionary with per-stage counts
+
+        Raises:
+            RuntimeError: If any stage failed
+        """
+        return self._run(lambda: self.slack_client.download_all_pdfs(
+            messages, download_path, on_downloaded=self._enqueue_download
+        ))
+
+    def run_channel(
+        self,
+        channel: str,
+        download_path: Path,
+        known_ids: Optional[Callable[[List[str]], Set[str]]] = None
+    ) -> Dict[str, int]:
+        """Process all PDF files in a channel, starting before its history is fetched.
+
+        Args:
+            channel: Channel ID or name
+            download_path: Directory to save downloaded files
+            known_ids: Optional callable returning the file IDs to skip,
+                       see SlackClient.download_channel_pdfs()
+
+        Returns:
+            Dictionary with per-stage counts
+
+        Raises:
+            RuntimeError: If any stage failed
+        """
+        return self._run(lambda: self.slack_client.download_channel_pdfs(
+            channel, download_path, on_downloaded=self._enqueue_download, known_ids=known_ids
+        ))
+
+    def _run(self, download: Callable[[], Any]) -> Dict[str, int]:
+        """Run all stages, with ``download`` feeding the first queue."""
+        self._download_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._extracted_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._metadata_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._seen_ids: Set[str] = set()
+        self._exhausted: Set[queue.Queue] = set()
+        self._errors: List[BaseException] = []
+        self._counts = {'downloaded': 0, 'processed': 0, 'characters': 0, 'extracted': 0, 'stored': 0}
+
+        stages = [
+            threading.Thread(target=self._download_stage, args=(download,), name="download"),
+            threading.Thread(target=self._extract_stage, name="extract"),
+            threading.Thread(target=self._metadata_stage, name="metadata"),
+            threading.Thread(target=self._store_stage, name="store"),
+        ]
+        for stage in stages:
+            stage.start()
+        for stage in stages:
+            stage.join()
+
+        logger.info(f"Downloaded {self._counts['downloaded']} PDF files")
+        logger.info(f"Processed {self._counts['processed']} PDFs")
+        logger.info(f"Total characters extracted: {self._counts['characters']}")
+        logger.info(f"Extracted metadata for {self._counts['extracted']} files")
+        logger.info(f"Stored {self._counts['stored']} documents in database")
+
+        if self._errors:
+            raise RuntimeError(f"Pipeline stage failed: {self._errors[0]}") from self._errors[0]
+
+        return dict(self._counts)
+
+    def _get(self, q: queue.Queue) -> Any:
+        """Take the next item from a queue, noting when it reaches the end."""
+        item = q.get()
+        if item is _SENTINEL:
+            self._exhausted.add(q)
+        return item
+
+    def _items(self, q: queue.Queue) -> Iterator[Any]:
+        """Iterate over a queue until its end-of-stream marker."""
+        return iter(lambda: self._get(q), _SENTINEL)
+
+    def _fail(self, stage: str, error: BaseException, upstream: Optional[queue.Queue]) -> None:
+        """Record a stage failure and drain its input so producers don't block."""
+        logger.error(f"{stage} stage failed: {error}", exc_info=True)
+        self._errors.append(error)
+        if upstream is None:
+            return
+        # Poll rather than block: a reader abandoned by the failed stage
+        # may still be waiting on this queue and take the marker first
+        while upstream not in self._exhausted:
+            try:
+                if upstream.get(timeout=0.1) is _SENTINEL:
+                    self._exhausted.add(upstream)
+            except queue.Empty:
+                continue
+
+    def _enqueue_download(self, download: DownloadResult) -> None:
+        """Pass a downloaded file on to extraction, once per file ID."""
+        # The same file may be shared in several messages; processing it
+        # twice at once would race on its extracted text file
+        if download.file_id in self._seen_ids:
+            return
+        self._seen_ids.add(download.file_id)
+        self._counts['downloaded'] += 1
+        # Later stages extend the record, so they work on plain dicts
+        self._download_q.put(asdict(download))
+
+    def _download_stage(self, download: Callable[[], Any]) -> None:
+        """Download PDFs and feed them to the extraction stage."""
+        try:
+            download()
+        except Exception as e:
+            self._fail("Download", e, None)
+        finally:
+            self._download_q.put(_SENTINEL)
+
+    def _extract_stage(self) -> None:
+        """Extract text in worker processes as downloads arrive."""
+        try:
+            # Cap the files held by the worker pool too: it reads its input
+            # eagerly, which would otherwise keep _download_q from filling
+            processed_files = self.pdf_processor.iter_process_pdfs(
+                self._items(self._download_q), max_in_flight=self.queue_size
+            )
+            for processed_file in processed_files:
+                self._counts['processed'] += 1
+                self._counts['characters'] += processed_file['text_length'] or 0
+                self._extracted_q.put(processed_file)
+        except Exception as e:
+            self._fail("Extract", e, self._download_q)
+        finally:
+            self._extracted_q.put(_SENTINEL)
+
+    def _metadata_stage(self) -> None:
+        """Run the OpenAI metadata stage on its own event loop."""
+        try:
+            asyncio.run(self._extract_metadata())
+        except Exception as e:
+            self._fail("Metadata", e, self._extracted_q)
+        finally:
+            self._metadata_q.put(_SENTINEL)
+
+    async def _extract_metadata(self) -> None:
+        """Pull extracted files and call OpenAI with bounded concurrency."""
+        sem = asyncio.Semaphore(self.metadata_concurrency)
+        try:
+            async with asyncio.TaskGroup() as tg:
+                while True:
+                    # Only take a file off the queue once a request slot is free
+                    await sem.acquire()
+                    file_info = await asyncio.to_thread(self._get, self._extracted_q)
+                    if file_info is _SENTINEL:
+                        sem.release()
+                        break
+                    tg.create_task(self._extract_one(sem, file_info))
+        finally:
+            # The OpenAI connections belong to this loop; close them before it ends
+            await self.metadata_extractor.aclose()
+
+    async def _extract_one(self, sem: asyncio.Semaphore, file_info: Dict[str, Any]) -> None:
+        """Extract metadata for one file and pass it on to storage."""
+        try:
+            file_with_metadata = await self.metadata_extractor.process_file_async(file_info)
+        finally:
+            sem.release()
+        self._counts['extracted'] += 1
+        await asyncio.to_thread(self._metadata_q.put, file_with_metadata)
+
+    def _store_stage(self) -> None:
+        """Write documents to the database in batches."""
+        batch: List[Dict[str, Any]] = []
+        try:
+            while True:
+                try:
+                    document = self._metadata_q.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    # Don't hold a partial batch while upstream is slow
+                    if batch:
+                        self._store_batch(batch)
+                        batch = []
+                    continue
+
+                if document is _SENTINEL:
+                    self._exhausted.add(self._metadata_q)
+                    break
+                batch.append(document)
+                if len(batch) >= self.batch_size:
+                    self._store_batch(batch)
+                    batch = []
+
+            if batch:
+                self._store_batch(batch)
+        except Exception as e:
+            self._fail("Store", e, self._metadata_q)
+
+    def _store_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Store one batch of documents.
+        
+        Batches of entirely new documents take the COPY fast path; anything
+        else, or a COPY that fails, goes through the upsert.
+        """
+        file_ids = [document['file_id'] for document in batch]
+        stored = 0
+        if len(set(file_ids)) == len(file_ids) and not self.db_manager.existing_ids(file_ids):
+            stored = self.db_manager.copy_insert_documents(batch)
+        if not stored:
+            stored = self.db_manager.bulk_insert_documents(batch)
+        self._counts['stored'] += stored
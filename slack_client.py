@@ -1,27 +1,149 @@
 """Slack client for fetching messages and downloading PDF attachments."""
+import asyncio
 import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterator, Optional, Set, Tuple
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+from urllib3.util.retry import Retry
 
-from config import Config
+from config import CONFIG
 
 logger = logging.getLogger(__name__)
 
+# Attempts per download when Slack answers 429 Too Many Requests
+_MAX_DOWNLOAD_ATTEMPTS = 3
+
+# MIME types treated as PDF attachments; some clients upload as x-pdf
+_ACCEPTED_MIMETYPES = frozenset({'application/pdf', 'application/x-pdf'})
+
+# Retry policy for synchronous downloads. Retry objects are immutable
+# (urllib3 derives a new one per attempt), so one instance is shared
+_DOWNLOAD_RETRY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=['GET'],
+    respect_retry_after_header=True
+)
+
+# Bytes gathered before each threaded write in the async download path
+_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Capacity of the queue between history paging and download workers
+_DOWNLOAD_QUEUE_SIZE = 32
+
+# Attempts at deleting the throwaway message used for channel lookups
+_MAX_DELETE_ATTEMPTS = 3
+
+# Seconds a resolved channel ID is trusted before it is looked up again
+_CHANNEL_CACHE_TTL = 600
+
+
+@dataclass(frozen=True, slots=True)
+class DownloadResult:
+    """A PDF file downloaded from Slack and the message it was shared in."""
+    file_id: str
+    file_name: str
+    local_path: Path
+    slack_url: str
+    message_ts: str
+    message_text: str
+    file_size: int
+
+
+def _messages_with_pdfs(messages: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Yield messages with PDF attachments, each with a 'pdf_files' list."""
+    for message in messages:
+        files = message.get('files')
+        if not files:
+            continue
+        pdf_files = [f for f in files if f.get('mimetype') in _ACCEPTED_MIMETYPES]
+        if not pdf_files:
+            continue
+        
+        message['pdf_files'] = pdf_files
+        yield message
+
+
+def _file_entries(item: Dict[str, Any]) -> Iterator[Tuple[Dict[str, Any], str, str]]:
+    """Yield (file_info, message_ts, message_text) for a message or a file object."""
+    if 'pdf_files' in item:
+        for file_info in item['pdf_files']:
+            yield file_info, item.get('ts', ''), item.get('text', '')
+    else:
+        # files.list results carry no message; fall back to the upload time
+        yield item, str(item.get('timestamp', '')), ''
+
+
+def local_pdf_path(download_path: Path, file_info: Dict[str, Any]) -> Path:
+    """Build the local path for a Slack file.
+    
+    The file ID prefix keeps same-named uploads apart; path separators in
+    the uploaded name are replaced so it cannot escape download_path.
+    """
+    name = file_info.get('name') or f"{file_info['id']}.pdf"
+    name = name.replace('/', '_').replace('\\', '_')
+    return download_path / f"{file_info['id']}_{name}"
+
+
+def _is_downloaded(file_path: Path, file_info: Dict[str, Any]) -> bool:
+    """Check whether a complete copy of the file is already on disk.
+    
+    A size mismatch means an earlier run was interrupted mid-download, so
+    the file is fetched again rather than trusted.
+    """
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return False
+    return st.st_size == file_info.get('size', st.st_size)
+
 
 class SlackClient:
     """Client for interacting with Slack API."""
     
-    def __init__(self, token: str):
+    def __init__(self, token: str, max_concurrent_downloads: int = 5, use_schedule_lookup: bool = True):
         """Initialize Slack client with bot token.
         
         Args:
             token: Slack bot token (xoxb-...)
+            max_concurrent_downloads: Maximum number of PDF downloads in flight
+            use_schedule_lookup: Resolve channel names with chat.scheduleMessage
+                                 (needs chat:write) instead of listing channels
         """
         self.client = WebClient(token=token)
+        # Used by the coroutines, so paging history doesn't tie up a thread
+        self.async_client = AsyncWebClient(token=token)
         self.token = token
+        self.max_concurrent_downloads = max_concurrent_downloads
+        self.use_schedule_lookup = use_schedule_lookup
+        self._auth_headers = {'Authorization': f'Bearer {token}'}
+        # channel name -> (channel ID, monotonic expiry time)
+        self._channel_id_cache: Dict[str, Tuple[str, float]] = {}
+        
+        # One session for all downloads keeps TCP/TLS connections to
+        # files.slack.com alive between files
+        self.session = requests.Session()
+        self.session.headers.update(self._auth_headers)
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=_DOWNLOAD_RETRY
+        )
+        self.session.mount('https://', adapter)
+    
+    def close(self):
+        """Close pooled HTTP connections."""
+        self.session.close()
     
     def get_channel_id(self, channel_name: str) -> str:
         """Get channel ID from channel name.
@@ -35,54 +157,145 @@ class SlackClient:
         Raises:
             ValueError: If channel not found
         """
+        cached = self._channel_id_cache.get(channel_name)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        
+        if self.use_schedule_lookup:
+            try:
+                channel_id = self._schedule_lookup(channel_name)
+                self._cache_channel_id(channel_name, channel_id)
+                return channel_id
+            except SlackApiError as e:
+                if e.response['error'] == 'channel_not_found':
+                    raise ValueError(f"Channel '{channel_name}' not found")
+                # e.g. missing chat:write scope; fall back to the channel list
+                logger.warning("Scheduled message lookup failed (%s), scanning channel list", e.response['error'])
+        
         try:
-            # Try to use the channel name directly first
-            response = self.client.conversations_list()
-            for channel in response['channels']:
-                if channel['name'] == channel_name:
-                    return channel['id']
+            cursor = None
+            while True:
+                # 1000 is Slack's page size cap; the default of 100 costs
+                # ten times the calls against a Tier 2 rate limit
+                response = self.client.conversations_list(
+                    limit=1000,
+                    cursor=cursor,
+                    exclude_archived=True,
+                    types='public_channel,private_channel'
+                )
+                for channel in response['channels']:
+                    # Remember every channel seen, not just the one asked for
+                    self._cache_channel_id(channel['name'], channel['id'])
+                    if channel['name'] == channel_name:
+                        return channel['id']
+                
+                cursor = response.get('response_metadata', {}).get('next_cursor')
+                if not cursor:
+                    break
             
             raise ValueError(f"Channel '{channel_name}' not found")
         except SlackApiError as e:
-            logger.error(f"Error fetching channel ID: {e}")
+            logger.error("Error fetching channel ID: %s", e)
             raise
     
-    def fetch_messages(self, channel: str, limit: int = 100) -> List[Dict[str, Any]]:
+    def _cache_channel_id(self, channel_name: str, channel_id: str) -> None:
+        """Remember a channel ID for _CHANNEL_CACHE_TTL seconds."""
+        self._channel_id_cache[channel_name] = (channel_id, time.monotonic() + _CHANNEL_CACHE_TTL)
+    
+    def _schedule_lookup(self, channel_name: str) -> str:
+        """Resolve a channel name server-side via a throwaway scheduled message.
+        
+        Slack resolves the name when scheduling and returns the channel ID,
+        so the lookup costs two calls regardless of workspace size. The
+        message is deleted long before it would be posted.
+        
+        Raises:
+            SlackApiError: If the message could not be scheduled
+            RuntimeError: If it was scheduled but could not be deleted
+        """
+        response = self.client.chat_scheduleMessage(
+            channel=channel_name,
+            text=' ',
+            post_at=int(time.time()) + 120
+        )
+        channel_id = response['channel']
+        message_id = response['scheduled_message_id']
+        
+        # A failed delete must not reach get_channel_id's fallback: the
+        # blank message would then be posted to the channel
+        for attempt in range(_MAX_DELETE_ATTEMPTS):
+            try:
+                self.client.chat_deleteScheduledMessage(channel=channel_id, scheduled_message_id=message_id)
+                return channel_id
+            except SlackApiError as e:
+                if e.response['error'] == 'invalid_scheduled_message_id':
+                    # Already gone; it can't have been posted this early
+                    return channel_id
+                error = e
+                if attempt < _MAX_DELETE_ATTEMPTS - 1:
+                    delay = int(e.response.headers.get('Retry-After', 1 << attempt))
+                    logger.warning("Deleting scheduled lookup message failed (%s), retrying in %ss", e.response['error'], delay)
+                    time.sleep(delay)
+        
+        logger.error(
+            "Could not delete scheduled message %s in channel %s; it will be posted in under two minutes "
+            "unless removed manually",
+            message_id, channel_id
+        )
+        raise RuntimeError(f"Failed to delete scheduled lookup message {message_id} in {channel_id}") from error
+    
+    def _resolve_channel(self, channel: str) -> str:
+        """Return the channel ID for a channel ID or name (with or without #)."""
+        channel = channel.lstrip('#')
+        # Public, private and DM channel IDs are upper-case alphanumerics
+        # starting with C, G or D; channel names are always lower-case
+        if channel[:1] in ('C', 'G', 'D') and channel.isalnum() and channel.isupper():
+            return channel
+        return self.get_channel_id(channel)
+    
+    def fetch_messages(
+        self,
+        channel: str,
+        limit: int = 200,
+        max_messages: Optional[int] = None,
+        oldest: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """Fetch message history from a channel.
         
         Args:
             channel: Channel ID or name
             limit: Maximum number of messages to fetch per page
+            max_messages: Stop once this many messages with PDFs are found
+                          (newest first); None fetches the whole history
+            oldest: Only fetch messages after this Slack timestamp
             
         Returns:
             List of message objects with file attachments
         """
-        # Get channel ID if channel name is provided
-        if not channel.startswith('C'):
-            channel_id = self.get_channel_id(channel)
-        else:
-            channel_id = channel
+        channel_id = self._resolve_channel(channel)
         
         messages_with_pdfs = []
         cursor = None
         
         try:
             while True:
-                logger.info(f"Fetching messages from channel {channel_id}...")
+                logger.info("Fetching messages from channel %s...", channel_id)
                 response = self.client.conversations_history(
                     channel=channel_id,
                     limit=limit,
-                    cursor=cursor
+                    cursor=cursor,
+                    oldest=oldest
                 )
                 
                 # Filter messages that have PDF file attachments
-                for message in response['messages']:
-                    if 'files' in message:
-                        pdf_files = [f for f in message['files'] if f.get('mimetype') == 'application/pdf']
-                        if pdf_files:
-                            message['pdf_files'] = pdf_files
-                            messages_with_pdfs.append(message)
-                            logger.info(f"Found message with {len(pdf_files)} PDF(s)")
+                for message in _messages_with_pdfs(response['messages']):
+                    messages_with_pdfs.append(message)
+                    # Runs once per matching message; skip even the call when INFO is off
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info("Found message with %d PDF(s)", len(message['pdf_files']))
+                    if max_messages and len(messages_with_pdfs) >= max_messages:
+                        logger.info("Reached %d messages with PDF attachments", max_messages)
+                        return messages_with_pdfs
                 
                 # Check if there are more pages
                 if not response.get('has_more', False):
@@ -92,90 +305,400 @@ class SlackClient:
                 if not cursor:
                     break
             
-            logger.info(f"Found {len(messages_with_pdfs)} messages with PDF attachments")
+            logger.info("Found %d messages with PDF attachments", len(messages_with_pdfs))
             return messages_with_pdfs
             
         except SlackApiError as e:
-            logger.error(f"Error fetching messages: {e}")
+            logger.error("Error fetching messages: %s", e)
+            raise
+    
+    def fetch_pdf_files(self, channel: str, max_files: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Fetch the PDF files shared in a channel via files.list.
+        
+        Slack filters by type server-side, so text-only messages are never
+        paged through; on busy channels this takes far fewer calls than
+        fetch_messages(). The files carry no message text.
+        
+        Args:
+            channel: Channel ID or name
+            max_files: Stop once this many files are found; None fetches all
+            
+        Returns:
+            List of Slack file objects
+        """
+        channel_id = self._resolve_channel(channel)
+        
+        files: List[Dict[str, Any]] = []
+        page = 1
+        
+        try:
+            while True:
+                logger.info("Fetching PDF files from channel %s (page %d)...", channel_id, page)
+                response = self.client.files_list(channel=channel_id, types='pdfs', count=200, page=page)
+                files.extend(response['files'])
+                
+                if max_files and len(files) >= max_files:
+                    files = files[:max_files]
+                    break
+                if page >= response.get('paging', {}).get('pages', 1):
+                    break
+                page += 1
+            
+            logger.info("Found %d PDF files", len(files))
+            return files
+            
+        except SlackApiError as e:
+            logger.error("Error fetching files: %s", e)
             raise
     
-    def download_pdf(self, file_info: Dict[str, Any], download_path: Path) -> Path:
+    def download_pdf(self, file_info: Dict[str, Any], file_path: Path) -> Path:
         """Download a PDF file from Slack.
         
         Args:
             file_info: File information dictionary from Slack API
-            download_path: Directory to save the file
+            file_path: Destination path, see local_pdf_path()
             
         Returns:
             Path to the downloaded file
         """
-        file_id = file_info['id']
-        file_name = file_info.get('name', f"{file_id}.pdf")
         url_private = file_info['url_private']
-        
-        # Create safe filename
-        safe_filename = f"{file_id}_{file_name}"
-        file_path = download_path / safe_filename
+        safe_filename = file_path.name
         
         # Skip if already downloaded (idempotency)
-        if file_path.exists():
-            logger.info(f"File {safe_filename} already exists, skipping download")
+        if _is_downloaded(file_path, file_info):
+            logger.info("File %s already exists, skipping download", safe_filename)
             return file_path
         
+        # Written under a temporary name so an interrupted download never
+        # leaves a file that looks complete
+        tmp_path = file_path.with_name(file_path.name + '.part')
         try:
-            logger.info(f"Downloading {safe_filename}...")
-            headers = {'Authorization': f'Bearer {self.token}'}
-            response = requests.get(url_private, headers=headers, stream=True)
+            logger.info("Downloading %s...", safe_filename)
+            response = self.session.get(url_private, stream=True)
             response.raise_for_status()
             
-            # Ensure directory exists
-            download_path.mkdir(parents=True, exist_ok=True)
+            # Save file; copyfileobj runs the copy loop with a 1MB buffer
+            # instead of one Python iteration per 8KB chunk
+            response.raw.decode_content = True
+            with open(tmp_path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=1024 * 1024)
+            os.replace(tmp_path, file_path)
             
-            # Save file
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            logger.info("Downloaded: %s", file_path)
+            return file_path
             
-            logger.info(f"Downloaded: {file_path}")
+        except Exception as e:
+            logger.error("Error downloading file %s: %s", safe_filename, e)
+            raise
+        finally:
+            # No-op once the file has been moved into place
+            tmp_path.unlink(missing_ok=True)
+    
+    async def _download_pdf_async(
+        self,
+        http_client: httpx.AsyncClient,
+        file_info: Dict[str, Any],
+        file_path: Path
+    ) -> Path:
+        """Download a PDF file from Slack using a shared HTTP/2 client.
+        
+        Args:
+            http_client: Client carrying the Slack authorization header
+            file_info: File information dictionary from Slack API
+            file_path: Destination path, see local_pdf_path()
+            
+        Returns:
+            Path to the downloaded file
+        """
+        url_private = file_info['url_private']
+        safe_filename = file_path.name
+        
+        # Skip if already downloaded (idempotency)
+        if _is_downloaded(file_path, file_info):
+            logger.info("File %s already exists, skipping download", safe_filename)
+            return file_path
+        
+        # Written under a temporary name so an interrupted download never
+        # leaves a file that looks complete
+        tmp_path = file_path.with_name(file_path.name + '.part')
+        try:
+            logger.info("Downloading %s...", safe_filename)
+            async with self._download_sem:
+                for attempt in range(_MAX_DOWNLOAD_ATTEMPTS):
+                    async with http_client.stream('GET', url_private) as response:
+                        if response.status_code == 429 and attempt < _MAX_DOWNLOAD_ATTEMPTS - 1:
+                            # Rate limited: hold the slot so other downloads back off too
+                            retry_after = int(response.headers.get('Retry-After', 1))
+                            logger.warning("Rate limited downloading %s, retrying in %ss", safe_filename, retry_after)
+                            await asyncio.sleep(retry_after)
+                            continue
+                        response.raise_for_status()
+                        
+                        # Save file; writes are gathered into 1MB blocks and
+                        # run in a thread so a slow disk doesn't stall the loop
+                        with open(tmp_path, 'wb') as f:
+                            buffer = bytearray()
+                            async for chunk in response.aiter_bytes(chunk_size=65536):
+                                buffer += chunk
+                                if len(buffer) >= _WRITE_BUFFER_SIZE:
+                                    await asyncio.to_thread(f.write, buffer)
+                                    buffer = bytearray()
+                            if buffer:
+                                await asyncio.to_thread(f.write, buffer)
+                        os.replace(tmp_path, file_path)
+                        break
+            
+            logger.info("Downloaded: %s", file_path)
             return file_path
             
         except Exception as e:
-            logger.error(f"Error downloading file {file_name}: {e}")
+            logger.error("Error downloading file %s: %s", safe_filename, e)
             raise
+        finally:
+            # Also runs on cancellation; a no-op once the file has been moved
+            tmp_path.unlink(missing_ok=True)
+    
+    def _http_client(self) -> httpx.AsyncClient:
+        """Create the client for one batch of downloads.
+        
+        HTTP/2 multiplexes the concurrent downloads over a few connections
+        to files.slack.com instead of one per in-flight request.
+        """
+        return httpx.AsyncClient(
+            http2=True,
+            headers=self._auth_headers,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            timeout=60.0,
+            # url_private may redirect; requests followed these by default but
+            # httpx does not (it drops Authorization on cross-host hops)
+            follow_redirects=True
+        )
     
-    def download_all_pdfs(self, messages: List[Dict[str, Any]], download_path: Path) -> List[Dict[str, Any]]:
+    async def _download_one(
+        self,
+        http_client: httpx.AsyncClient,
+        file_info: Dict[str, Any],
+        file_path: Path,
+        message_ts: str,
+        message_text: str,
+        on_downloaded: Optional[Callable[[DownloadResult], None]]
+    ) -> Optional[DownloadResult]:
+        """Download one file and build its metadata, or None on failure."""
+        try:
+            local_path = await self._download_pdf_async(http_client, file_info, file_path)
+            
+            downloaded_file = DownloadResult(
+                file_id=file_info['id'],
+                file_name=file_info.get('name', 'unknown.pdf'),
+                local_path=local_path,
+                slack_url=file_info.get('permalink', ''),
+                message_ts=message_ts,
+                message_text=message_text,
+                file_size=file_info.get('size', 0)
+            )
+        except Exception as e:
+            logger.error("Failed to download file: %s", e)
+            return None
+        
+        # Run off the event loop so a callback blocked on a full queue
+        # doesn't stall history paging or in-flight streams. Calls are
+        # serialized: while one blocks, finished downloads wait here and
+        # their channel workers take no new files, which pauses downloads
+        if on_downloaded is not None:
+            async with self._callback_lock:
+                await asyncio.to_thread(on_downloaded, downloaded_file)
+        return downloaded_file
+    
+    async def _download_all_async(
+        self,
+        messages: List[Dict[str, Any]],
+        download_path: Path,
+        on_downloaded: Optional[Callable[[DownloadResult], None]] = None
+    ) -> List[DownloadResult]:
+        """Download all PDF files from messages concurrently."""
+        # A file re-shared in several messages is downloaded once, credited
+        # to the first message it appears in
+        pending: Dict[str, Tuple[Dict[str, Any], Path, str, str]] = {}
+        for item in messages:
+            for file_info, message_ts, message_text in _file_entries(item):
+                if file_info['id'] not in pending:
+                    pending[file_info['id']] = (
+                        file_info,
+                        local_pdf_path(download_path, file_info),
+                        message_ts,
+                        message_text
+                    )
+        
+        # Created here so it binds to the event loop of this run
+        self._download_sem = asyncio.Semaphore(self.max_concurrent_downloads)
+        self._callback_lock = asyncio.Lock()
+        
+        async with self._http_client() as http_client:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [
+                    tg.create_task(self._download_one(
+                        http_client, file_info, file_path, message_ts, message_text, on_downloaded
+                    ))
+                    for file_info, file_path, message_ts, message_text in pending.values()
+                ]
+        
+        # Keep message order in the result regardless of completion order
+        return [task.result() for task in tasks if task.result() is not None]
+    
+    def download_all_pdfs(
+        self,
+        messages: List[Dict[str, Any]],
+        download_path: Path,
+        on_downloaded: Optional[Callable[[DownloadResult], None]] = None
+    ) -> List[DownloadResult]:
         """Download all PDF files from messages.
         
+        Downloads run concurrently on a private event loop, so this must not
+        be called from a thread that is already running one.
+        
         Args:
-            messages: List of messages with PDF files
+            messages: List of messages with PDF files, as returned by
+                      fetch_messages(), or of file objects, as returned by
+                      fetch_pdf_files()
             download_path: Directory to save files
+            on_downloaded: Optional callback invoked with each file's
+                           metadata as soon as it is downloaded, letting
+                           callers start processing before the batch ends.
+                           Runs in a worker thread, one call at a time
             
         Returns:
-            List of dictionaries with file metadata and local paths
+            List of DownloadResult records
         """
-        downloaded_files = []
+        download_path.mkdir(parents=True, exist_ok=True)
+        downloaded_files = asyncio.run(self._download_all_async(messages, download_path, on_downloaded))
+        
+        logger.info("Downloaded %d PDF files", len(downloaded_files))
+        return downloaded_files
+    
+    async def _produce(
+        self,
+        channel_id: str,
+        queue: asyncio.Queue,
+        limit: int,
+        known_ids: Optional[Callable[[List[str]], Set[str]]],
+        workers: int
+    ) -> None:
+        """Page through channel history, queueing PDFs as each page arrives."""
+        seen: Set[str] = set()
+        skipped = 0
+        cursor = None
         
-        for message in messages:
-            message_ts = message.get('ts', '')
-            message_text = message.get('text', '')
+        while True:
+            logger.info("Fetching messages from channel %s...", channel_id)
+            response = await self.async_client.conversations_history(
+                channel=channel_id,
+                limit=limit,
+                cursor=cursor
+            )
             
-            for file_info in message.get('pdf_files', []):
-                try:
-                    local_path = self.download_pdf(file_info, download_path)
-                    
-                    downloaded_files.append({
-                        'file_id': file_info['id'],
-                        'file_name': file_info.get('name', 'unknown.pdf'),
-                        'local_path': local_path,
-                        'slack_url': file_info.get('permalink', ''),
-                        'message_ts': message_ts,
-                        'message_text': message_text,
-                        'file_size': file_info.get('size', 0)
-                    })
-                except Exception as e:
-                    logger.error(f"Failed to download file: {e}")
-                    continue
-        
-        logger.info(f"Downloaded {len(downloaded_files)} PDF files")
+            page = []
+            for message in _messages_with_pdfs(response['messages']):
+                for file_info in message['pdf_files']:
+                    if file_info['id'] not in seen:
+                        seen.add(file_info['id'])
+                        page.append((file_info, message.get('ts', ''), message.get('text', '')))
+            
+            if page and known_ids is not None:
+                known = await asyncio.to_thread(known_ids, [fi['id'] for fi, _, _ in page])
+                skipped += len(known)
+                page = [entry for entry in page if entry[0]['id'] not in known]
+            
+            for entry in page:
+                await queue.put(entry)
+            
+            # Check if there are more pages
+            if not response.get('has_more', False):
+                break
+            cursor = response.get('response_metadata', {}).get('next_cursor')
+            if not cursor:
+                break
+        
+        logger.info("Found %d PDF files in channel history", len(seen))
+        if known_ids is not None:
+            logger.info("Skipping %d already processed files", skipped)
+        for _ in range(workers):
+            await queue.put(None)
+    
+    async def _consume(
+        self,
+        http_client: httpx.AsyncClient,
+        queue: asyncio.Queue,
+        download_path: Path,
+        results: List[DownloadResult],
+        on_downloaded: Optional[Callable[[DownloadResult], None]]
+    ) -> None:
+        """Download queued PDFs until the producer signals the end."""
+        while (entry := await queue.get()) is not None:
+            file_info, message_ts, message_text = entry
+            downloaded_file = await self._download_one(
+                http_client, file_info, local_pdf_path(download_path, file_info),
+                message_ts, message_text, on_downloaded
+            )
+            if downloaded_file is not None:
+                results.append(downloaded_file)
+    
+    async def _download_channel_async(
+        self,
+        channel_id: str,
+        download_path: Path,
+        on_downloaded: Optional[Callable[[DownloadResult], None]],
+        known_ids: Optional[Callable[[List[str]], Set[str]]],
+        limit: int
+    ) -> List[DownloadResult]:
+        """Overlap history paging with downloads of the PDFs found so far."""
+        self._download_sem = asyncio.Semaphore(self.max_concurrent_downloads)
+        self._callback_lock = asyncio.Lock()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_DOWNLOAD_QUEUE_SIZE)
+        results: List[DownloadResult] = []
+        workers = self.max_concurrent_downloads
+        
+        async with self._http_client() as http_client:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._produce(channel_id, queue, limit, known_ids, workers))
+                for _ in range(workers):
+                    tg.create_task(self._consume(http_client, queue, download_path, results, on_downloaded))
+        
+        return results
+    
+    def download_channel_pdfs(
+        self,
+        channel: str,
+        download_path: Path,
+        on_downloaded: Optional[Callable[[DownloadResult], None]] = None,
+        known_ids: Optional[Callable[[List[str]], Set[str]]] = None,
+        limit: int = 200
+    ) -> List[DownloadResult]:
+        """Fetch channel history and download its PDF files in one pass.
+        
+        Unlike fetch_messages() followed by download_all_pdfs(), downloads
+        start as soon as the first history page is in, instead of after
+        the whole history has been paged through.
+        
+        Args:
+            channel: Channel ID or name
+            download_path: Directory to save files
+            on_downloaded: Optional callback invoked with each file's
+                           metadata as soon as it is downloaded. Runs in
+                           a worker thread, one call at a time
+            known_ids: Optional callable given each page's file IDs and
+                       returning those to skip, e.g.
+                       DatabaseManager.existing_ids
+            limit: Maximum number of messages to fetch per page
+            
+        Returns:
+            List of DownloadResult records,
+            in completion order
+        """
+        channel_id = self._resolve_channel(channel)
+        download_path.mkdir(parents=True, exist_ok=True)
+        downloaded_files = asyncio.run(self._download_channel_async(
+            channel_id, download_path, on_downloaded, known_ids, limit
+        ))
+        
+        logger.info("Downloaded %d PDF files", len(downloaded_files))
         return downloaded_files
-